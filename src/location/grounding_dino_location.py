@@ -7,11 +7,98 @@ warnings.filterwarnings(
 )
 
 import torch
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from transformers import AutoProcessor, AutoModelForZeroShotObjectDetection
+from transformers import AutoProcessor, AutoModelForZeroShotObjectDetection, BatchFeature, BitsAndBytesConfig
 import os
 import time
-import json
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_TAGS_DIR = os.path.join(SCRIPT_DIR, "..", "tagging", "output_tags")
+
+class CudaGraphConvEncoder(torch.nn.Module):
+    """
+    Wraps the Grounding DINO image backbone to replay CUDA Graphs captured for fixed input shapes.
+
+    A graph is captured up front for each batch size bucket at the fixed image size, before any concurrent
+    work starts. Smaller batches are run in the closest bigger bucket, and inputs that do not match any
+    captured shape or are not on CUDA run eagerly.
+    """
+
+    def __init__(
+            self,
+            conv_encoder: torch.nn.Module,
+            batch_sizes: tuple = (1, 2, 4, 8),
+            warmup_iters: int = 3
+    ):
+        super().__init__()
+
+        self.conv_encoder = conv_encoder
+        self.batch_sizes = sorted(batch_sizes)
+        self.warmup_iters = warmup_iters
+        self.graphs = {}
+
+    def capture(self, key: tuple, dtype: torch.dtype, device: torch.device) -> tuple:
+        """
+        Captures the backbone forward pass for the given (batch size, height, width) key.
+        """
+        batch_size, height, width = key
+
+        # Persistent input buffers, the graph always reads from them
+        static_pixel_values = torch.zeros(
+            (batch_size, 3, height, width),
+            dtype=dtype,
+            device=device
+        ).to(memory_format=torch.channels_last)
+        static_pixel_mask = torch.ones(
+            (batch_size, height, width),
+            dtype=torch.long,
+            device=device
+        )
+
+        # Warm up on a side stream before capturing
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(self.warmup_iters):
+                self.conv_encoder(static_pixel_values, static_pixel_mask)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_outputs = self.conv_encoder(static_pixel_values, static_pixel_mask)
+
+        return graph, static_pixel_values, static_pixel_mask, static_outputs
+
+    def capture_all(self, height: int, width: int, dtype: torch.dtype, device: torch.device) -> None:
+        """
+        Captures a graph for every batch size bucket at the given image size.
+        Must run before any other GPU work is launched concurrently, a failed capture is not recoverable.
+        """
+        for batch_size in self.batch_sizes:
+            key = (batch_size, height, width)
+            self.graphs[key] = self.capture(key, dtype, device)
+
+        torch.cuda.synchronize()
+
+    def forward(self, pixel_values: torch.Tensor, pixel_mask: torch.Tensor) -> list:
+        batch_size = pixel_values.shape[0]
+        bucket = next((b for b in self.batch_sizes if b >= batch_size), None)
+        key = (bucket, *pixel_values.shape[-2:])
+
+        if not pixel_values.is_cuda or key not in self.graphs:
+            return self.conv_encoder(pixel_values, pixel_mask)
+
+        # Copy the new inputs into the static buffers and replay the graph
+        graph, static_pixel_values, static_pixel_mask, static_outputs = self.graphs[key]
+        static_pixel_values[:batch_size].copy_(pixel_values)
+        static_pixel_mask[:batch_size].copy_(pixel_mask)
+        graph.replay()
+
+        return [(feature_map[:batch_size], mask[:batch_size]) for feature_map, mask in static_outputs]
 
 class GroundingDinoLocator:
     """
@@ -22,10 +109,16 @@ class GroundingDinoLocator:
 
     def __init__(
             self,
-            grounding_dino_model_id: str = "IDEA-Research/grounding-dino-base",            
+            grounding_dino_model_id: str = "IDEA-Research/grounding-dino-tiny",  # "IDEA-Research/grounding-dino-base" for offline annotation
             score_threshold: float = 0.2,
             save_file_json: bool = True,
-            save_file_jpg: bool = True
+            save_file_jpg: bool = True,
+            precision: str = "fp16",  # Model weights precision: "fp32", "fp16" or "int8" (requires bitsandbytes)
+            mixed_precision: bool = False,  # Whether to run an fp32 model under FP16 autocast on the GPU
+            prompt_cache_size: int = 32,  # Maximum number of tokenized prompts kept in the cache
+            compile_model: bool = False,  # Whether to compile the image backbone with torch.compile
+            use_cuda_graph: bool = False,  # Whether to replay CUDA Graphs for the image backbone
+            static_image_size: tuple = (800, 800)  # Fixed (height, width) the images are resized to when compiling or using CUDA Graphs
     ):
         """
         TODO
@@ -33,15 +126,80 @@ class GroundingDinoLocator:
 
         print(f"{self.STR_PREFIX} Initializing Grounding DINO object locator...", end=" ")
 
-        self.script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.script_dir = SCRIPT_DIR
         self.score_threshold = score_threshold if score_threshold > 0 else 0.2
         self.save_file_json = save_file_json
         self.save_file_jpg = save_file_jpg
 
+        # Last tags file read from INPUT_TAGS_DIR (path and modification time) and its content
+        self.last_tags_file = None
+        self.last_tags_file_content = None
+
+        # Font for the bounding box labels, loaded on the first draw
+        self.font = None
+
+        if precision not in ("fp32", "fp16", "int8"):
+            raise ValueError(f"{self.STR_PREFIX} Unsupported precision: {precision}. Use 'fp32', 'fp16' or 'int8'.")
+
         # Load the processor and model
         device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.processor = AutoProcessor.from_pretrained(grounding_dino_model_id)
-        self.model = AutoModelForZeroShotObjectDetection.from_pretrained(grounding_dino_model_id).to(device)
+
+        # FP16 weights only pay off on the GPU
+        if precision == "fp16" and device == "cpu":
+            precision = "fp32"
+
+        self.processor = AutoProcessor.from_pretrained(grounding_dino_model_id, use_fast=True)
+
+        if precision == "int8":
+            # 8-bit models are placed on the device when loaded, they cannot be moved afterwards
+            self.model = AutoModelForZeroShotObjectDetection.from_pretrained(
+                grounding_dino_model_id,
+                quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+                device_map=device
+            )
+        else:
+            self.model = AutoModelForZeroShotObjectDetection.from_pretrained(
+                grounding_dino_model_id,
+                torch_dtype=torch.float16 if precision == "fp16" else torch.float32
+            ).to(device=device, memory_format=torch.channels_last)
+
+        self.model.eval()
+
+        # FP16 autocast only makes sense for an fp32 model on the GPU
+        self.autocast_enabled = mixed_precision and precision == "fp32" and device == "cuda"
+
+        # Least recently used cache of tokenized prompts, so that repeated prompts are only tokenized once
+        self.prompt_cache = OrderedDict()
+        self.prompt_cache_size = prompt_cache_size if prompt_cache_size > 0 else 32
+
+        # The fast image processor resizes and normalizes the images directly on the device
+        self.image_processor_kwargs = {"device": device}
+
+        self.use_cuda_graph = use_cuda_graph and device == "cuda"
+        backbone = self.model.model.backbone
+
+        # torch.compile (dynamic=False) and CUDA Graphs need static shapes, so every image is resized to the same size
+        if compile_model or self.use_cuda_graph:
+            self.image_processor_kwargs["size"] = {"height": static_image_size[0], "width": static_image_size[1]}
+
+        # Compile only the image backbone: the rest of the model builds its text masks
+        # with data-dependent Python loops and sees a different prompt length on every call
+        if compile_model:
+            torch.set_float32_matmul_precision("high")
+            # The "reduce-overhead" mode captures its own CUDA Graphs, not needed on top of the manual ones
+            mode = "default" if self.use_cuda_graph else "reduce-overhead"
+            backbone.conv_encoder = torch.compile(backbone.conv_encoder, mode=mode, dynamic=False)
+
+        if self.use_cuda_graph:
+            backbone.conv_encoder = CudaGraphConvEncoder(backbone.conv_encoder)
+
+            # Capture every batch size bucket now, before the pipeline runs other GPU work concurrently
+            with torch.inference_mode(), self.autocast():
+                backbone.conv_encoder.capture_all(*static_image_size, dtype=self.model.dtype, device=self.model.device)
+
+        # Let the compiler specialize for the static image size before the first real image
+        if compile_model:
+            self.warmup(iters=2)
 
         if save_file_json or save_file_jpg:
             # Output location directory path
@@ -52,27 +210,81 @@ class GroundingDinoLocator:
 
             # Create the output directory if it does not exist
             os.makedirs(self.output_location_dir, exist_ok=True)
+
+        # Output files are written in the background, out of the critical path (the executor is created on the first write)
+        self.io_executor = None
+        self.io_futures = []
         
         print("Done.")
 
-    def load_image(self, input_image_name: str) -> None:
+    def load_image(self, input_image_name: str, pipeline_image: Image.Image = None) -> None:
         print(f"{self.STR_PREFIX} Loading input image: {input_image_name}...", end=" ")
 
-        # Input image path
-        input_image_path = os.path.join(
-            self.script_dir, 
-            "..",                
-            "input_images",
-            input_image_name
-        )
+        # If pipeline_image (already decoded RGB image) is provided, use it
+        if pipeline_image is not None:
+            self.input_image = pipeline_image
 
-        # Load input image
-        if os.path.isfile(input_image_path):
-            self.input_image = Image.open(input_image_path)
+        # Otherwise, read the image from input_images
         else:
-            raise FileNotFoundError(f"{self.STR_PREFIX} The image {input_image_name} was not found at {input_image_path}.")
+            # Input image path
+            input_image_path = os.path.join(
+                self.script_dir, 
+                "..",                
+                "input_images",
+                input_image_name
+            )
+
+            # Load and decode input image upfront
+            try:
+                self.input_image = Image.open(input_image_path)
+                self.input_image.load()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"{self.STR_PREFIX} The image {input_image_name} was not found at {input_image_path}.") from None
+
+            if self.input_image.mode != "RGB":
+                self.input_image = self.input_image.convert("RGB")
+
+        self.processor_image = self.downscale_image(self.input_image)
         
         print("Done.")
+
+    def load_images(self, input_image_names: list[str], pipeline_images: list[Image.Image] = None) -> None:
+        """
+        Loads a batch of input images for batched inference.
+        """
+        self.input_images = []
+        self.processor_images = []
+
+        if pipeline_images is None:
+            pipeline_images = [None] * len(input_image_names)
+
+        for input_image_name, pipeline_image in zip(input_image_names, pipeline_images):
+            self.load_image(input_image_name, pipeline_image)
+            self.input_images.append(self.input_image)
+            self.processor_images.append(self.processor_image)
+
+    def downscale_image(self, image: Image.Image) -> Image.Image:
+        """
+        Resizes the image in uint8 to the processor target size, so that the processor
+        does not tensorize the full resolution image. Smaller images are returned as they are.
+        """
+        size = self.image_processor_kwargs.get("size", self.processor.image_processor.size)
+        width, height = image.size
+
+        # Fixed target size
+        if size.get("height") and size.get("width"):
+            target_width, target_height = size["width"], size["height"]
+            if width <= target_width and height <= target_height:
+                return image
+
+        # Aspect ratio preserving target size
+        else:
+            scale = min(size["shortest_edge"] / min(width, height), size["longest_edge"] / max(width, height))
+            if scale >= 1:
+                return image
+            target_width, target_height = round(width * scale), round(height * scale)
+
+        return image.resize((target_width, target_height), Image.BILINEAR)
     
     def load_tags(self, pipeline_tags: list = None) -> None:
         print(f"{self.STR_PREFIX} Loading input tags...", end=" ")
@@ -83,35 +295,38 @@ class GroundingDinoLocator:
         
         # Otherwise, read the most recent .json file from output_tags
         else:
-            # Input tags directory path
-            input_tags_dir = os.path.join(
-                self.script_dir, 
-                "..",
-                "tagging",
-                "output_tags"
-            )
-
-            # Gather all .json files in input_tags_dir
-            json_files = [
-                os.path.join(input_tags_dir, f)
-                for f in os.listdir(input_tags_dir)
-                if f.endswith(".json")
-            ]
-            if not json_files:
-                raise FileNotFoundError(f"{self.STR_PREFIX} No .json files found in {input_tags_dir}")
-
-            # Select the most recently modified .json file
-            latest_json_path = max(json_files, key=os.path.getmtime)
-            
-            # Extract the filename
-            filename = os.path.basename(latest_json_path)
-            print("Most recent .json file: ", filename, end="... ")
-            
-            # Read the content of the file
-            with open(latest_json_path, "r", encoding="utf-8") as f:
-                self.input_tags = json.load(f)
+            # Select the most recently modified .json file in INPUT_TAGS_DIR (DirEntry caches its stat)
+            with os.scandir(INPUT_TAGS_DIR) as entries:
+                latest_json = max(
+                    (entry for entry in entries if entry.name.endswith(".json")),
+                    key=lambda entry: entry.stat().st_mtime,
+                    default=None
+                )
+            if latest_json is None:
+                raise FileNotFoundError(f"{self.STR_PREFIX} No .json files found in {INPUT_TAGS_DIR}")
+
+            print("Most recent .json file: ", latest_json.name, end="... ")
+
+            # Read the content of the file, unless it has not changed since the last time it was read
+            latest_json_key = (latest_json.path, latest_json.stat().st_mtime)
+            if latest_json_key != self.last_tags_file:
+                with open(latest_json.path, "rb") as f:
+                    self.last_tags_file_content = orjson.loads(f.read())
+                self.last_tags_file = latest_json_key
+
+            self.input_tags = self.last_tags_file_content
 
         print("Done.")        
+
+    def load_tags_batch(self, pipeline_tags_batch: list[list]) -> None:
+        """
+        Loads the tags of a batch of images, in the same order as the loaded images.
+        """
+        print(f"{self.STR_PREFIX} Loading input tags for {len(pipeline_tags_batch)} images...", end=" ")
+
+        self.input_tags_batch = pipeline_tags_batch
+
+        print("Done.")
     
     def json_to_gdino_prompt(self, tags: list) -> str:
         """
@@ -122,19 +337,22 @@ class GroundingDinoLocator:
 
         return prompt
     
-    def gdino_results_to_json(self, results: dict) -> dict:
+    def gdino_results_to_json(self, results: dict) -> list:
         """
-        Converts the Grounding DINO results to a JSON dict.
+        Converts the Grounding DINO results to a JSON dict,
+        keeping only the detections above the confidence threshold.
         """
-        scores = results.get("scores", torch.tensor([])).tolist()
-        boxes = results.get("boxes", torch.tensor([])).tolist()
+        scores = results.get("scores", torch.tensor([])).cpu().numpy()
+        boxes = results.get("boxes", torch.tensor([])).cpu().numpy()
         labels = results.get("labels", [])
-                
-        result = []
-        for label, bbox, score in zip(labels, boxes, scores):
-            obj = {
-                "label": label,
-                "score": float(score),
+
+        # Filter the results based on the confidence threshold before building the dicts
+        keep = np.flatnonzero(scores > self.score_threshold)
+
+        return [
+            {
+                "label": labels[i],
+                "score": score,
                 "bbox": {
                     "x_min": bbox[0],
                     "y_min": bbox[1],
@@ -142,16 +360,8 @@ class GroundingDinoLocator:
                     "y_max": bbox[3]
                 }
             }
-            result.append(obj)
-        
-        return result
-    
-    def filter_confidence(self, results: dict, threshold: float) -> dict:
-        """
-        Filters the results based on the confidence threshold.
-        """
-        filtered_results = [result for result in results if result["score"] > threshold]
-        return filtered_results        
+            for i, score, bbox in zip(keep, scores[keep].tolist(), boxes[keep].tolist())
+        ]
 
     def filter_bbox(self, results_json: dict, image_width, image_height, padding: float = 30, ratio: float = 0.9 , verbose: bool = False):
         def is_similar_bbox(bbox1, bbox2, padding):
@@ -246,28 +456,27 @@ class GroundingDinoLocator:
         """
         Draws bounding boxes around the detected objects in the image.
         """    
+        if self.font is None:
+            self.font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
+
         image = self.input_image.copy()
-        draw = ImageDraw.Draw(image)        
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
+        draw = ImageDraw.Draw(image)
+        font = self.font
+
+        # Extract the integer bounding box coordinates of every detected object
+        rects = [
+            (int(obj["bbox"]["x_min"]), int(obj["bbox"]["y_min"]), int(obj["bbox"]["x_max"]), int(obj["bbox"]["y_max"]))
+            for obj in results
+        ]
 
         # Draw bounding boxes for each detected object
-        for obj in results:
-            label = obj.get("label", "unknown")
-            score = obj.get("score", 0.0)
-            bbox = obj.get("bbox", {})
-            
-            # Extract bounding box coordinates
-            x_min = int(bbox.get("x_min", 0))
-            y_min = int(bbox.get("y_min", 0))
-            x_max = int(bbox.get("x_max", 0))
-            y_max = int(bbox.get("y_max", 0))
-            
+        for obj, rect in zip(results, rects):
             # Draw the bounding box
-            draw.rectangle([x_min, y_min, x_max, y_max], outline="red", width=3)
+            draw.rectangle(rect, outline="red", width=3)
             
             # Draw the label and score
-            text = f"{label}: {score:.2f}"
-            draw.text((x_min, y_min), text, fill="red", font=font)
+            text = f"{obj['label']}: {obj['score']:.2f}"
+            draw.text(rect[:2], text, fill="red", font=font)
 
         # If padding is not None, draw a green rectangle that represents the padding for reference
         if padding is not None:
@@ -293,41 +502,134 @@ class GroundingDinoLocator:
 
         return image
     
-    def run(self) -> dict:
+    def autocast(self) -> torch.autocast:
         """
-        TODO
+        FP16 autocast context for the forward pass, a no-op unless mixed precision is enabled.
+        The cast weights are not cached when using CUDA Graphs, since the cache is freed
+        when the context exits while the captured graphs would still read from it.
         """
-        print(f"{self.STR_PREFIX} Running Grounding DINO object bounding box locator...", end=" ")
+        return torch.autocast(
+            "cuda",
+            dtype=torch.float16,
+            enabled=self.autocast_enabled,
+            cache_enabled=not self.use_cuda_graph
+        )
 
-        # Convert the tags JSON text to a Grounding Dino prompt
-        text = self.json_to_gdino_prompt(self.input_tags)
+    def warmup(self, iters: int = 1) -> None:
+        """
+        Runs the model on a dummy black image, so that the first real image
+        does not pay the one-time compilation and initialization costs.
+        """
+        size = self.image_processor_kwargs.get("size", {"height": 800, "width": 800})
+        image = Image.new("RGB", (size["width"], size["height"]))
+        inputs = self.preprocess([image], ["object."])
 
-        # Process and predict
-        inputs = self.processor(images=self.input_image, text=text, return_tensors="pt").to(self.model.device)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-        
-        results = self.processor.post_process_grounded_object_detection(
-            outputs,
-            inputs.input_ids,
-            target_sizes=[self.input_image.size[::-1]]
-        )[0]
+        for _ in range(iters):
+            with torch.inference_mode(), self.autocast():
+                self.model(**inputs)
+
+    def preprocess(self, images: list[Image.Image], texts: list[str]) -> BatchFeature:
+        """
+        Builds the model inputs, running the image processor on the images
+        and reusing the cached tokenization of the already seen prompts.
+        """
+        tokenizer = self.processor.tokenizer
+
+        # Tokenize all the prompts missing from the cache in a single call
+        missing_texts = [text for text in dict.fromkeys(texts) if text not in self.prompt_cache]
+        if missing_texts:
+            missing_encodings = tokenizer(missing_texts)
+            for i, text in enumerate(missing_texts):
+                self.prompt_cache[text] = {key: torch.tensor(values[i]) for key, values in missing_encodings.items()}
+
+        encodings = []
+        for text in texts:
+            self.prompt_cache.move_to_end(text)
+            encodings.append(self.prompt_cache[text])
+
+        # Evict the least recently used prompts
+        while len(self.prompt_cache) > self.prompt_cache_size:
+            self.prompt_cache.popitem(last=False)
+
+        # Right-pad the prompts to the longest one in the batch, as the BERT tokenizer does
+        text_inputs = {
+            key: torch.nn.utils.rnn.pad_sequence(
+                [encoding[key] for encoding in encodings],
+                batch_first=True,
+                padding_value=tokenizer.pad_token_id if key == "input_ids" else 0
+            )
+            for key in encodings[0]
+        }
+        image_inputs = self.processor.image_processor(images, return_tensors="pt", **self.image_processor_kwargs)
+
+        inputs = BatchFeature(data={**image_inputs, **text_inputs}).to(device=self.model.device, dtype=self.model.dtype)
+
+        # NHWC layout for the backbone convolutions
+        inputs["pixel_values"] = inputs["pixel_values"].to(memory_format=torch.channels_last)
+
+        return inputs
+
+    def save_json(self, results_json_bytes: bytes, output_file_json: str) -> None:
+        """
+        Writes the already serialized JSON results to a file.
+        """
+        with open(output_file_json, "wb") as f:
+            f.write(results_json_bytes)
+        print(f"{self.STR_PREFIX} Object bounding box location JSON results saved to: {output_file_json}")
+
+    def save_jpg(self, results_image: Image.Image, output_file_jpg: str) -> None:
+        """
+        Encodes and saves the image with bounding boxes.
+        """
+        results_image.save(output_file_jpg)
+        print(f"{self.STR_PREFIX} Bounding box location image saved to: {output_file_jpg}")
+
+    def submit_io(self, fn, *args) -> None:
+        """
+        Runs an output file write in the background, raising the errors of the already finished writes.
+        """
+        if self.io_executor is None:
+            self.io_executor = ThreadPoolExecutor(max_workers=2)
+
+        pending_futures = []
+        for future in self.io_futures:
+            if future.done():
+                future.result()
+            else:
+                pending_futures.append(future)
 
+        pending_futures.append(self.io_executor.submit(fn, *args))
+        self.io_futures = pending_futures
+
+    def close(self) -> None:
+        """
+        Waits for the pending output files to be written, raising the first write error if any.
+        """
+        if self.io_executor is not None:
+            self.io_executor.shutdown(wait=True)
+            self.io_executor = None
+
+        io_futures, self.io_futures = self.io_futures, []
+        for future in io_futures:
+            future.result()
+
+    def process_results(self, results: dict, output_suffix: str = "") -> list:
+        """
+        Converts, filters and optionally saves the Grounding DINO results for the loaded image and tags.
+        """
         print(f"Object detection results:\n\n{results}")
 
-        # Convert the results to a JSON dict
+        # Convert the results to a JSON dict, filtering them based on the confidence threshold
         results_json = self.gdino_results_to_json(results)
 
-        # Filter the results based on the confidence threshold
-        results_json = self.filter_confidence(results_json, threshold=self.score_threshold)
-
         # Filter the results based on bounding box properties
         results_json = self.filter_bbox(results_json, self.input_image.width, self.input_image.height, verbose=True)
 
         # Filter the results based on label coincidence with the tagging stage
         results_json = self.filter_labels(results_json, self.input_tags)
 
-        print(f"{self.STR_PREFIX} JSON results:\n\n{json.dumps(results_json, indent=4)}")
+        results_json_bytes = orjson.dumps(results_json, option=orjson.OPT_INDENT_2)
+        print(f"{self.STR_PREFIX} JSON results:\n\n{results_json_bytes.decode()}")
 
         # Save the results to a JSON file and/or an image file
         if self.save_file_json or self.save_file_jpg:
@@ -336,28 +638,79 @@ class GroundingDinoLocator:
 
             if self.save_file_json:
                 # Prepare JSON output file
-                output_filename_json = f"location_gdino_{timestamp}.json"
+                output_filename_json = f"location_gdino_{timestamp}{output_suffix}.json"
                 output_file_json = os.path.join(self.output_location_dir, output_filename_json)
 
-                # Save the results to a JSON file
-                with open(output_file_json, "w", encoding="utf-8") as f:
-                    json.dump(results_json, f, indent=4)
-                    print(f"{self.STR_PREFIX} Object bounding box location JSON results saved to: {output_file_json}")
+                # Save the results to a JSON file in the background
+                self.submit_io(self.save_json, results_json_bytes, output_file_json)
 
             if self.save_file_jpg:
                 # Prepare JPG output file
-                output_filename_jpg = f"location_gdino_{timestamp}.jpg"
+                output_filename_jpg = f"location_gdino_{timestamp}{output_suffix}.jpg"
                 output_file_jpg = os.path.join(self.output_location_dir, output_filename_jpg)
 
                 # Draw bounding boxes around the detected objects
                 results_image = self.draw_bounding_boxes(results=results_json, padding=30)
 
-                # Save the image with bounding boxes
-                results_image.save(output_file_jpg)
-                print(f"{self.STR_PREFIX} Bounding box location image saved to: {output_file_jpg}")
+                # Save the image with bounding boxes in the background
+                self.submit_io(self.save_jpg, results_image, output_file_jpg)
 
         return results_json
 
+    def run(self) -> list:
+        """
+        Locates the objects of the loaded tags in the loaded image.
+        """
+        print(f"{self.STR_PREFIX} Running Grounding DINO object bounding box locator...", end=" ")
+
+        # Convert the tags JSON text to a Grounding Dino prompt
+        text = self.json_to_gdino_prompt(self.input_tags)
+
+        # Process and predict (boxes are rescaled to the original image size)
+        inputs = self.preprocess([self.processor_image], [text])
+        with torch.inference_mode(), self.autocast():
+            outputs = self.model(**inputs)
+        
+        results = self.processor.post_process_grounded_object_detection(
+            outputs,
+            inputs.input_ids,
+            target_sizes=[self.input_image.size[::-1]]
+        )[0]
+
+        return self.process_results(results)
+
+    def run_batch(self) -> list[list]:
+        """
+        Locates the objects of the loaded tags batch in the loaded images with a single padded forward pass.
+        """
+        print(f"{self.STR_PREFIX} Running Grounding DINO object bounding box locator on {len(self.input_images)} images...", end=" ")
+
+        if len(self.input_images) != len(self.input_tags_batch):
+            raise ValueError(f"{self.STR_PREFIX} The number of images ({len(self.input_images)}) and tag lists ({len(self.input_tags_batch)}) must match.")
+
+        # Convert each tags JSON text to a Grounding Dino prompt
+        texts = [self.json_to_gdino_prompt(tags) for tags in self.input_tags_batch]
+
+        # Process and predict the whole batch at once (images and prompts are padded to the largest ones)
+        inputs = self.preprocess(self.processor_images, texts)
+        with torch.inference_mode(), self.autocast():
+            outputs = self.model(**inputs)
+
+        results_batch = self.processor.post_process_grounded_object_detection(
+            outputs,
+            inputs.input_ids,
+            target_sizes=[image.size[::-1] for image in self.input_images]
+        )
+
+        # Post-process each image with its own tags
+        results_json_batch = []
+        for i, (image, tags, results) in enumerate(zip(self.input_images, self.input_tags_batch, results_batch)):
+            self.input_image = image
+            self.input_tags = tags
+            results_json_batch.append(self.process_results(results, output_suffix=f"_{i}"))
+
+        return results_json_batch
+
 def main():
     """
     Main function for the Grounding DINO Locator.
@@ -368,6 +721,7 @@ def main():
     locator.load_image("desk.jpg")
     locator.load_tags()
     locator.run()
+    locator.close()
 
 
 if __name__ == "__main__":
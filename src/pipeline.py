@@ -1,4 +1,9 @@
+import os
 import time
+import numpy as np
+import torch
+from PIL import Image
+from concurrent.futures import Future, ThreadPoolExecutor
 from utils.print_utils import print_green, print_purple
 
 from tagging.ram_plus_tagging.ram_plus_tagging import RamPlusTagger
@@ -21,10 +26,15 @@ class PipelineTLS:
             tagging_submethods: str,
             location_method: str,
             segmentation_method: str,
-            save_files: bool = False
+            save_files: bool = False,
+            warmup: bool = True,
+            grounding_dino_model_id: str = "IDEA-Research/grounding-dino-tiny",
+            grounding_dino_precision: str = "fp16"
         ):
         print_purple("\n[PIPELINE] Loading models...")
 
+        self.script_dir = os.path.dirname(os.path.abspath(__file__))
+
         self.tagging_method = tagging_method
         self.tagging_submethods = tagging_submethods
         self.location_method = location_method
@@ -41,13 +51,59 @@ class PipelineTLS:
                 self.extractor_deepseek = DeepseekKeywordExtractor(save_file=save_files)
 
         if location_method == GROUNDING_DINO:
-            self.locator_gdino = GroundingDinoLocator(save_file_jpg=save_files, save_file_json=save_files)
+            self.locator_gdino = GroundingDinoLocator(
+                grounding_dino_model_id=grounding_dino_model_id,
+                precision=grounding_dino_precision,
+                save_file_jpg=save_files,
+                save_file_json=save_files
+            )
         
         if segmentation_method == SAM2:
             self.segmenter_sam2 = Sam2Segmenter()
 
+        # Warm up the GPU models, so that the first image does not pay the one-time CUDA setup costs
+        if warmup and torch.cuda.is_available():
+            print_purple("\n[PIPELINE] Warming up models...")
+
+            if location_method == GROUNDING_DINO:
+                self.locator_gdino.warmup()
+            if segmentation_method == SAM2:
+                self.segmenter_sam2.warmup()
+
+            torch.cuda.synchronize()
+            torch.cuda.empty_cache()
+
+        # Separate CUDA streams, so that location and segmentation can overlap in the pipelined execution
+        self.location_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+        self.segmentation_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+
         print_purple("\n[PIPELINE] All models loaded successfully.")
 
+    def close(self) -> None:
+        """
+        Waits for the output files still being written in the background.
+        """
+        if self.location_method == GROUNDING_DINO:
+            self.locator_gdino.close()
+
+    def load_image_once(self, input_image_name: str) -> dict:
+        """
+        Decodes the input image once, to be shared by the location and segmentation stages.
+        """
+        input_image_path = os.path.join(self.script_dir, "input_images", input_image_name)
+
+        # Load and decode the image upfront
+        try:
+            pil_image = Image.open(input_image_path)
+            pil_image.load()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"\n[PIPELINE] The image {input_image_name} was not found at {input_image_path}.") from None
+
+        if pil_image.mode != "RGB":
+            pil_image = pil_image.convert("RGB")
+
+        return {"pil": pil_image, "array": np.array(pil_image)}
+
     def tagging(self, input_image_name: str) -> list:
         if self.tagging_method == RAM_PLUS:
             print_green(f"{RAM_PLUS}")
@@ -68,33 +124,156 @@ class PipelineTLS:
                 return self.extractor_deepseek.run()
         return []
 
-    def location(self, input_image_name: str, input_tags: dict) -> dict:
+    def location(self, input_image_name: str, input_tags: dict, input_image: dict = None) -> dict:
         if self.location_method == GROUNDING_DINO:
             print_green(f"{GROUNDING_DINO}")
-            self.locator_gdino.load_image(input_image_name)
+            self.locator_gdino.load_image(input_image_name, input_image["pil"] if input_image else None)
             self.locator_gdino.load_tags(input_tags)
             return self.locator_gdino.run()
         return {}
 
-    def segmentation(self, input_image_name: str, input_bbox_location: dict):
+    def segmentation(self, input_image_name: str, input_bbox_location: dict, input_image: dict = None):
         if self.segmentation_method == SAM2:
             print_green(f"{SAM2}")
-            self.segmenter_sam2.load_image(input_image_name)
+            self.segmenter_sam2.load_image(input_image_name, input_image["array"] if input_image else None)
             self.segmenter_sam2.load_bbox_location(input_bbox_location)
             self.segmenter_sam2.run()
 
-    def run(self, input_image_name: str) -> float:
-        start_time = time.time()
+    def location_batch(self, input_image_names: list[str], input_tags_batch: list[list], input_images: list[dict] = None) -> list[list]:
+        if self.location_method == GROUNDING_DINO:
+            print_green(f"{GROUNDING_DINO}")
+            self.locator_gdino.load_images(input_image_names, [image["pil"] for image in input_images] if input_images else None)
+            self.locator_gdino.load_tags_batch(input_tags_batch)
+            return self.locator_gdino.run_batch()
+        return [[] for _ in input_image_names]
+
+    def segmentation_batch(self, input_image_names: list[str], input_bbox_location_batch: list[list], input_images: list[dict] = None):
+        if self.segmentation_method == SAM2:
+            print_green(f"{SAM2}")
+            self.segmenter_sam2.load_images(input_image_names, [image["array"] for image in input_images] if input_images else None)
+            self.segmenter_sam2.load_bbox_location_batch(input_bbox_location_batch)
+            self.segmenter_sam2.run_batch()
+
+    def start_timer(self):
+        """
+        Starts a timer: a CUDA event recorded on the current stream if available
+        (so that timing does not force CPU-GPU syncs mid-run), otherwise the wall-clock time.
+        """
+        if torch.cuda.is_available():
+            start_event = torch.cuda.Event(enable_timing=True)
+            start_event.record()
+            return start_event
+        return time.time()
+
+    def stop_timer(self, start_timer) -> float:
+        """
+        Returns the seconds elapsed since start_timer, synchronizing only once at the end.
+        """
+        if isinstance(start_timer, torch.cuda.Event):
+            end_event = torch.cuda.Event(enable_timing=True)
+            end_event.record()
+            torch.cuda.synchronize()
+            return start_timer.elapsed_time(end_event) / 1000
+        return time.time() - start_timer
+
+    def run(self, input_image_name: str, input_image: dict = None) -> float:
+        start_timer = self.start_timer()
         print_purple("\n[PIPELINE] Starting pipeline execution...")
 
+        # Decode the image, unless it has been preloaded with load_image_once
+        if input_image is None:
+            input_image = self.load_image_once(input_image_name)
+
         tagging_output = self.tagging(input_image_name)
-        location_output = self.location(input_image_name, tagging_output)
-        self.segmentation(input_image_name, location_output)
+        location_output = self.location(input_image_name, tagging_output, input_image)
+        self.segmentation(input_image_name, location_output, input_image)
+
+        total_time = self.stop_timer(start_timer)
+
+        print_purple(f"\n[PIPELINE] Pipeline execution completed in {total_time} seconds.")
+        return total_time
+
+    def run_batch(self, input_image_names: list[str], input_images: list[dict] = None) -> float:
+        """
+        Runs the pipeline on several images: tagging image by image,
+        then a single batched location and a single batched segmentation.
+        """
+        start_timer = self.start_timer()
+        print_purple(f"\n[PIPELINE] Starting batched pipeline execution on {len(input_image_names)} images...")
+
+        tagging_outputs = []
+        for i, input_image_name in enumerate(input_image_names):
+            print_purple(f"\n[PIPELINE] Tagging image {i+1}/{len(input_image_names)}...")
+            tagging_outputs.append(self.tagging(input_image_name))
+
+        # Decode the images, unless they have been preloaded with load_image_once
+        if input_images is None:
+            input_images = [self.load_image_once(input_image_name) for input_image_name in input_image_names]
+
+        location_outputs = self.location_batch(input_image_names, tagging_outputs, input_images)
+        self.segmentation_batch(input_image_names, location_outputs, input_images)
+
+        total_time = self.stop_timer(start_timer)
+
+        print_purple(f"\n[PIPELINE] Batched pipeline execution completed in {total_time} seconds.")
+        return total_time
+
+    def run_stage(self, stream, stage, input_image_name: str, previous_stage_future: Future, input_image_future: Future):
+        """
+        Runs a pipeline stage on its CUDA stream (no-op if None),
+        once the previous stage has finished and the image has been decoded.
+        """
+        previous_stage_output = previous_stage_future.result()
+        input_image = input_image_future.result()
+
+        with torch.cuda.stream(stream):
+            return stage(input_image_name, previous_stage_output, input_image)
+
+    def run_pipelined(self, input_image_names: list[str], input_images: list[dict] = None) -> float:
+        """
+        Runs the pipeline on several images, overlapping the stages of consecutive images:
+        while an image is located or segmented, the next ones are already being tagged.
+        """
+        start_time = time.time()
+        print_purple(f"\n[PIPELINE] Starting pipelined execution on {len(input_image_names)} images...")
+
+        # One worker per stage, since each stage keeps the state of the image it is processing
+        with ThreadPoolExecutor(max_workers=1) as loading_executor, \
+            ThreadPoolExecutor(max_workers=1) as tagging_executor, \
+            ThreadPoolExecutor(max_workers=1) as location_executor, \
+            ThreadPoolExecutor(max_workers=1) as segmentation_executor:
+
+            # Decode the images in the background, unless they have been preloaded with load_image_once
+            if input_images is None:
+                input_image_futures = [
+                    loading_executor.submit(self.load_image_once, input_image_name)
+                    for input_image_name in input_image_names
+                ]
+            else:
+                input_image_futures = [Future() for _ in input_images]
+                for input_image_future, input_image in zip(input_image_futures, input_images):
+                    input_image_future.set_result(input_image)
+            tagging_futures = [
+                tagging_executor.submit(self.tagging, input_image_name)
+                for input_image_name in input_image_names
+            ]
+            location_futures = [
+                location_executor.submit(self.run_stage, self.location_stream, self.location, input_image_name, tagging_future, input_image_future)
+                for input_image_name, tagging_future, input_image_future in zip(input_image_names, tagging_futures, input_image_futures)
+            ]
+            segmentation_futures = [
+                segmentation_executor.submit(self.run_stage, self.segmentation_stream, self.segmentation, input_image_name, location_future, input_image_future)
+                for input_image_name, location_future, input_image_future in zip(input_image_names, location_futures, input_image_futures)
+            ]
+
+            # Wait for every image (and raise the first error, if any)
+            for segmentation_future in segmentation_futures:
+                segmentation_future.result()
 
         end_time = time.time()
         total_time = end_time - start_time
 
-        print_purple(f"\n[PIPELINE] Pipeline execution completed in {total_time} seconds.")
+        print_purple(f"\n[PIPELINE] Pipelined execution completed in {total_time} seconds.")
         return total_time
 
 
@@ -103,6 +282,7 @@ def main(iters: int = 1):
     tagging_submethods = (LLAVA, DEEPSEEK)
     location_method = GROUNDING_DINO
     segmentation_method = SAM2
+    execution_mode = "pipelined"  # "batched" or "pipelined", when running multiple iterations
 
     pipeline = PipelineTLS(
         tagging_method=tagging_method,
@@ -115,21 +295,29 @@ def main(iters: int = 1):
     # input_image_name = "desk.jpg"
     input_image_name = ["desk.jpg", "279.jpg", "603.jpg", "963.jpg", "1108.jpg", "1281.jpg", "1514.jpg", "1729.jpg", "1871.jpg", "2421.jpg"]
 
+    # Each iteration runs on a different input image
+    if iters > len(input_image_name):
+        raise ValueError(f"\n[PIPELINE] {iters} iterations requested, but there are only {len(input_image_name)} input images.")
+
+    # Preload the input images, so that decoding them is not part of the measured time
+    input_image_name = input_image_name[:max(iters, 1)]
+    input_images = [pipeline.load_image_once(name) for name in input_image_name]
+
     # One iteration
     if iters <= 1:
-        pipeline.run(input_image_name=input_image_name)
+        pipeline.run(input_image_name=input_image_name[0], input_image=input_images[0])
     
-    # Multiple iterations, to measure the average execution time
+    # Multiple iterations, over several input images to measure the average execution time per image
     else:
-        total_time = 0
+        if execution_mode == "batched":
+            total_time = pipeline.run_batch(input_image_names=input_image_name, input_images=input_images)
+        else:
+            total_time = pipeline.run_pipelined(input_image_names=input_image_name, input_images=input_images)
 
-        for i in range(iters):
-            print_purple(f"\n[PIPELINE] Execution {i+1}/{iters}...")
-            # total_time += pipeline.run(input_image_name=input_image_name)
-            total_time += pipeline.run(input_image_name=input_image_name[i])
+        avg_time = total_time / len(input_image_name)
+        print_purple(f"\n[PIPELINE] Average execution time per image over {len(input_image_name)} images: {avg_time} seconds.")
 
-        avg_time = total_time / iters
-        print_purple(f"\n[PIPELINE] Average execution time over {iters} runs: {avg_time} seconds.")
+    pipeline.close()
 
 if __name__ == "__main__":
     main(10)
\ No newline at end of file
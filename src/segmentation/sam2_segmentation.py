@@ -48,9 +48,26 @@ class Sam2Segmenter:
         
         print("Done.")
                 
-    def load_image(self, input_image_name: str) -> None:
+    def warmup(self) -> None:
+        """
+        Runs SAM2 on a dummy black image, so that the first real image
+        does not pay the one-time initialization costs.
+        """
+        image = np.zeros((224, 224, 3), dtype=np.uint8)
+
+        with torch.inference_mode(), torch.autocast("cuda", dtype=torch.bfloat16):
+            self.predictor.set_image(image)
+            self.predictor.predict(box=[[0, 0, 112, 112]])
+
+    def load_image(self, input_image_name: str, pipeline_image: np.ndarray = None) -> None:
         print(f"{self.STR_PREFIX} Loading input image: {input_image_name}...", end=" ")
 
+        # If pipeline_image (already decoded RGB array) is provided, use it
+        if pipeline_image is not None:
+            self.input_image = pipeline_image
+            print("Done.")
+            return
+
         # Input image path
         input_image_path = os.path.join(
             self.script_dir, 
@@ -59,15 +76,27 @@ class Sam2Segmenter:
             input_image_name
         )
         
-        # Load input image
-        if os.path.isfile(input_image_path):
-            input_image_bgr = cv2.imread(input_image_path)
-            self.input_image = cv2.cvtColor(input_image_bgr, cv2.COLOR_BGR2RGB)
-        else:
+        # Load input image (cv2.imread returns None if the image cannot be read)
+        input_image_bgr = cv2.imread(input_image_path)
+        if input_image_bgr is None:
             raise FileNotFoundError(f"{self.STR_PREFIX} The image {input_image_name} was not found at {input_image_path}.")
+        self.input_image = cv2.cvtColor(input_image_bgr, cv2.COLOR_BGR2RGB)
 
         print("Done.")
 
+    def load_images(self, input_image_names: list[str], pipeline_images: list[np.ndarray] = None) -> None:
+        """
+        Loads a batch of input images for batched segmentation.
+        """
+        self.input_images = []
+
+        if pipeline_images is None:
+            pipeline_images = [None] * len(input_image_names)
+
+        for input_image_name, pipeline_image in zip(input_image_names, pipeline_images):
+            self.load_image(input_image_name, pipeline_image)
+            self.input_images.append(self.input_image)
+
     def load_bbox_location(self, pipeline_bbox_location: dict = None) -> None:
         print(f"{self.STR_PREFIX} Loading input bounding box location information...", end=" ")
 
@@ -107,6 +136,16 @@ class Sam2Segmenter:
 
         print("Done.")
 
+    def load_bbox_location_batch(self, pipeline_bbox_location_batch: list[list]) -> None:
+        """
+        Loads the bounding box location information of a batch of images, in the same order as the loaded images.
+        """
+        print(f"{self.STR_PREFIX} Loading input bounding box location information for {len(pipeline_bbox_location_batch)} images...", end=" ")
+
+        self.input_bbox_location_batch = pipeline_bbox_location_batch
+
+        print("Done.")
+
     def highlighted_segment_image(self, image, mask, label="unknown", color=(0, 255, 0), alpha=0.5):
         """
         Overlay a segmentation mask on the image and add a label.
@@ -163,45 +202,86 @@ class Sam2Segmenter:
         )
         return output_jpg_path
     
-    def run(self):
+    def create_output_dir(self) -> str:
         """
-        Perform instance segmentation using SAM2 and the provided bounding boxes.
+        Create a unique timestamped output directory for the segments of one image.
         """
-        print(f"{self.STR_PREFIX} Running SAM2 instance segmentation...")
+        # Prepare timestamp
+        timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
 
-        if self.save_files_jpg or self.save_files_npy:
-                # Prepare timestamp
-                timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+        # Output timestamped directory path
+        base_output_timestamped_segments_dir = os.path.join(
+            self.output_segments_dir,
+            f"segmentation_sam2_{timestamp}"
+        )
 
-                # Output timestamped directory path
-                base_output_timestamped_segments_dir = os.path.join(
-                    self.output_segments_dir,
-                    f"segmentation_sam2_{timestamp}"
-                )
+        # Ensure the output directory is unique
+        output_timestamped_segments_dir = base_output_timestamped_segments_dir
+        counter = 1
 
-                # Ensure the output directory is unique
-                output_timestamped_segments_dir = base_output_timestamped_segments_dir
-                counter = 1
+        while os.path.exists(output_timestamped_segments_dir):
+            output_timestamped_segments_dir = f"{base_output_timestamped_segments_dir}_{counter}"
+            counter += 1
 
-                while os.path.exists(output_timestamped_segments_dir):
-                    output_timestamped_segments_dir = f"{base_output_timestamped_segments_dir}_{counter}"
-                    counter += 1
+        # Create the unique timestamped output directory 
+        os.makedirs(output_timestamped_segments_dir)
 
-                # Create the unique timestamped output directory 
-                os.makedirs(output_timestamped_segments_dir)
+        return output_timestamped_segments_dir
 
-        # Iterate over each instance in the input_bbox_location
-        for i, instance in enumerate(self.input_bbox_location):
-            bbox = instance.get("bbox", {})
+    def bbox_coords(self, instance: dict) -> list:
+        """
+        Extract the bounding box of an instance in the format [x_min, y_min, x_max, y_max].
+        """
+        bbox = instance.get("bbox", {})
+
+        return [
+            int(bbox.get("x_min", 0)),
+            int(bbox.get("y_min", 0)),
+            int(bbox.get("x_max", 0)),
+            int(bbox.get("y_max", 0))
+        ]
+
+    def save_segment(self, image, best_mask, instance: dict, output_dir: str, idx: int) -> None:
+        """
+        Save the segmented image and/or mask of an instance, depending on the saving options.
+        """
+        # Save the segmented image if save_files_jpg is True
+        if self.save_files_jpg:                
+            output_image_path = self.build_path_jpg(output_dir=output_dir, idx=idx)
+            
+            highlighted_segment_image = self.highlighted_segment_image(
+                image, 
+                best_mask, 
+                label=instance.get("label", "unknown")
+            )
             
-            # Extract bounding box coordinates
-            x_min = int(bbox.get("x_min", 0))
-            y_min = int(bbox.get("y_min", 0))
-            x_max = int(bbox.get("x_max", 0))
-            y_max = int(bbox.get("y_max", 0))
+            cv2.imwrite(
+                output_image_path,
+                cv2.cvtColor(highlighted_segment_image, cv2.COLOR_RGB2BGR)
+            )
             
+            print(f"{self.STR_PREFIX} Segmented image for instance {idx} saved at: {output_image_path}")
+
+        # Save the segmentation results to a JSON file if save_files_npy is True
+        if self.save_files_npy:
+            output_npy_path = self.build_path_npy(output_dir=output_dir, idx=idx)
+            np.save(output_npy_path, best_mask)
+            print(f"{self.STR_PREFIX} Segmented mask for instance {idx} saved at: {output_npy_path}")
+    
+    def run(self):
+        """
+        Perform instance segmentation using SAM2 and the provided bounding boxes.
+        """
+        print(f"{self.STR_PREFIX} Running SAM2 instance segmentation...")
+
+        output_timestamped_segments_dir = None
+        if self.save_files_jpg or self.save_files_npy:
+            output_timestamped_segments_dir = self.create_output_dir()
+
+        # Iterate over each instance in the input_bbox_location
+        for i, instance in enumerate(self.input_bbox_location):
             # Define the bounding box in the format [x_min, y_min, x_max, y_max]
-            bbox_coords = [x_min, y_min, x_max, y_max]
+            bbox_coords = self.bbox_coords(instance)
 
             # Segmentation with SAM2
             with torch.inference_mode(), torch.autocast("cuda", dtype=torch.bfloat16):
@@ -212,28 +292,48 @@ class Sam2Segmenter:
             best_mask_index = np.argmax(scores)
             best_mask = masks[best_mask_index]
 
-            # Save the segmented image if save_files_jpg is True
-            if self.save_files_jpg:                
-                output_image_path = self.build_path_jpg(output_dir=output_timestamped_segments_dir, idx=i)
-                
-                highlighted_segment_image = self.highlighted_segment_image(
-                    self.input_image, 
-                    best_mask, 
-                    label=instance.get("label", "unknown")
-                )
-                
-                cv2.imwrite(
-                    output_image_path,
-                    cv2.cvtColor(highlighted_segment_image, cv2.COLOR_RGB2BGR)
-                )
-                
-                print(f"{self.STR_PREFIX} Segmented image for instance {i} saved at: {output_image_path}")
+            self.save_segment(self.input_image, best_mask, instance, output_timestamped_segments_dir, i)
+
+    def run_batch(self):
+        """
+        Perform instance segmentation of a batch of images using SAM2 and the provided bounding boxes,
+        embedding all the images and predicting all their boxes in a single batched call.
+        """
+        print(f"{self.STR_PREFIX} Running SAM2 instance segmentation on {len(self.input_images)} images...")
+
+        if len(self.input_images) != len(self.input_bbox_location_batch):
+            raise ValueError(f"{self.STR_PREFIX} The number of images ({len(self.input_images)}) and bounding box lists ({len(self.input_bbox_location_batch)}) must match.")
+
+        # Only the images with at least one bounding box are segmented
+        indices = [i for i, bbox_location in enumerate(self.input_bbox_location_batch) if bbox_location]
+        if not indices:
+            print(f"{self.STR_PREFIX} No bounding boxes to segment.")
+            return
+
+        box_batch = [
+            np.array([self.bbox_coords(instance) for instance in self.input_bbox_location_batch[i]])
+            for i in indices
+        ]
+
+        # Batched segmentation with SAM2
+        with torch.inference_mode(), torch.autocast("cuda", dtype=torch.bfloat16):
+            self.predictor.set_image_batch([self.input_images[i] for i in indices])
+            masks_batch, scores_batch, _ = self.predictor.predict_batch(box_batch=box_batch)
+
+        for i, boxes, masks, scores in zip(indices, box_batch, masks_batch, scores_batch):
+            # SAM2 squeezes the box dimension when there is a single box
+            masks = masks.reshape((len(boxes),) + masks.shape[-3:])
+            scores = scores.reshape(len(boxes), -1)
+
+            output_timestamped_segments_dir = None
+            if self.save_files_jpg or self.save_files_npy:
+                output_timestamped_segments_dir = self.create_output_dir()
+
+            for j, instance in enumerate(self.input_bbox_location_batch[i]):
+                # Get the best mask (the one with the highest score)
+                best_mask = masks[j][np.argmax(scores[j])]
 
-            # Save the segmentation results to a JSON file if save_files_npy is True
-            if self.save_files_npy:
-                output_npy_path = self.build_path_npy(output_dir=output_timestamped_segments_dir, idx=i)
-                np.save(output_npy_path, best_mask)
-                print(f"{self.STR_PREFIX} Segmented mask for instance {i} saved at: {output_npy_path}")
+                self.save_segment(self.input_images[i], best_mask, instance, output_timestamped_segments_dir, j)
     
 def main():
     segmenter = Sam2Segmenter()
@@ -1,5 +1,7 @@
 import ollama
+from PIL import Image
 
+import io
 import os
 import time
 
@@ -15,7 +17,10 @@ class LlavaDescriptor:
         llava_model_name: str = "llava:34b",        
         prompt: str = "Describe the image.",
         iters: int = 1,  # Number of iterations to run the model
+        max_image_size: int = 1344,  # Longest image side sent to the model, LLaVA does not use higher resolutions
         save_file: bool = True,  # Whether to save the description results to a file
+        keep_alive: str = "30m",  # How long Ollama keeps the model loaded after each call
+        num_predict: int = 512,  # Maximum number of tokens of each description
         timeout: int = 200  # Timeout in seconds
     ):
         """
@@ -28,7 +33,10 @@ class LlavaDescriptor:
         self.llava_model_name = llava_model_name        
         self.prompt = prompt
         self.iters = iters if iters > 0 else 1
+        self.max_image_size = max_image_size
         self.save_file = save_file
+        self.keep_alive = keep_alive
+        self.num_predict = num_predict
         self.timeout = timeout if timeout > 0 else 200
         
         if save_file:
@@ -56,9 +64,19 @@ class LlavaDescriptor:
             input_image_name
         )
         
-        # Check if the image exists
-        if not os.path.isfile(self.input_image_path):
-            raise FileNotFoundError(f"{self.STR_PREFIX} The image {self.input_image_name} was not found.")
+        # Large images are resized in uint8 and sent as JPEG bytes, smaller ones are sent by path
+        self.input_image = self.input_image_path
+        try:
+            with Image.open(self.input_image_path) as image:
+                if max(image.size) > self.max_image_size:
+                    image = image.convert("RGB")
+                    image.thumbnail((self.max_image_size, self.max_image_size), Image.BILINEAR)
+
+                    buffer = io.BytesIO()
+                    image.save(buffer, format="JPEG", quality=95)
+                    self.input_image = buffer.getvalue()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{self.STR_PREFIX} The image {input_image_name} was not found.") from None
         
         print("Done.")
 
@@ -105,9 +123,11 @@ class LlavaDescriptor:
                         {
                             "role": "user",
                             "content": self.prompt,
-                            "images": [self.input_image_path]
+                            "images": [self.input_image]
                         }
-                    ]
+                    ],
+                    keep_alive=self.keep_alive,
+                    options={"num_predict": self.num_predict}
                 )
                 descriptions[i] = response["message"]["content"]
                 if descriptions[i].strip(): # Not empty
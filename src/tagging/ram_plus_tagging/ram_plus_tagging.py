@@ -65,10 +65,11 @@ class RamPlusTagger:
         )
 
         # Load and transform input image
-        if os.path.isfile(image_path):
-            self.image = self.transform(Image.open(image_path)).unsqueeze(0).to(self.device)
-        else:
-            raise FileNotFoundError(f"{self.STR_PREFIX} The image '{input_image_name}' was not found at {image_path}.")
+        try:
+            input_image = Image.open(image_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{self.STR_PREFIX} The image '{input_image_name}' was not found at {image_path}.") from None
+        self.image = self.transform(input_image).unsqueeze(0).to(self.device)
         
         print("Done.")
 